@@ -0,0 +1,299 @@
+"""
+Cache module for the Telegram Analyzer package.
+
+This module provides a persistent cache of answers, so questions that were
+already answered with the same model, collection and context size don't go
+through retrieval and generation again. Besides exact matches, the cache can
+match paraphrased questions by the cosine similarity of their embeddings.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Union
+
+import numpy as np
+
+from telegram_analyzer.logging import logger
+
+
+def _create_schema(connection: sqlite3.Connection) -> None:
+    """
+    Create the cache table, adding the columns missing from older cache files.
+
+    Args:
+        connection: Connection to the cache database
+    """
+    with connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, answer TEXT, metadata BLOB)"
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(cache)")}
+        for column, column_type in (
+                ("scope", "TEXT"),
+                ("embedding", "BLOB"),
+                ("question", "TEXT"),
+                ("collection", "TEXT")
+        ):
+            if column not in columns:
+                connection.execute(f"ALTER TABLE cache ADD COLUMN {column} {column_type}")
+
+
+class AnswerCache:
+    """
+    SQLite-backed cache of answers keyed by question and query settings.
+
+    When an embedding function is given, the embeddings of answered questions
+    are stored as well (in FP16) and kept in memory as a matrix. A question
+    without an exact match is then answered from the most similar cached
+    question, if their cosine similarity reaches the threshold. Only questions
+    that missed are added, so the stored embeddings stay at least the
+    threshold apart and act as the centroids of the cached questions.
+    """
+
+    def __init__(
+            self,
+            cache_file: Union[str, Path],
+            collection_name: str,
+            model_name: str,
+            top_k: int,
+            embed: Optional[Callable[[str], np.ndarray]] = None,
+            embedding_model_name: Optional[str] = None,
+            similarity_threshold: float = 0.86
+    ):
+        """
+        Initialize the AnswerCache.
+
+        Args:
+            cache_file: Path to the SQLite database file
+            collection_name: Name of the ChromaDB collection the answers come from
+            model_name: Name of the Ollama model that produced the answers
+            top_k: Number of relevant messages included in the context
+            embed: Optional function returning the embedding of a question,
+                enables matching of similar questions
+            embedding_model_name: Name of the model used by `embed`
+            similarity_threshold: Minimum cosine similarity for a similar question to match
+        """
+        self.cache_file = Path(cache_file)
+        self.collection_name = collection_name
+        self.model_name = model_name
+        self.top_k = top_k
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model_name = embedding_model_name
+        # Embeddings are only compared within the same query settings and embedding model
+        raw_scope = f"{model_name}|{collection_name}|{top_k}|{embedding_model_name}"
+        self.scope = hashlib.sha256(raw_scope.encode("utf-8")).hexdigest()
+
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._pending_embeddings: Dict[str, np.ndarray] = {}
+        self._connection = sqlite3.connect(self.cache_file, check_same_thread=False)
+        _create_schema(self._connection)
+
+        self._keys: List[str] = []
+        self._embeddings: Optional[np.ndarray] = None
+        if self.embed is not None:
+            self._load_embeddings()
+        logger.info(f"Using answer cache: {self.cache_file}")
+
+    def _load_embeddings(self) -> None:
+        """
+        Load the stored question embeddings for the current query settings.
+        """
+        rows = self._connection.execute(
+            "SELECT key, embedding FROM cache WHERE scope = ? AND embedding IS NOT NULL",
+            (self.scope,)
+        ).fetchall()
+        if not rows:
+            return
+
+        self._keys = [key for key, _ in rows]
+        self._embeddings = np.stack([
+            np.frombuffer(embedding, dtype=np.float16).astype(np.float32)
+            for _, embedding in rows
+        ])
+        logger.info(f"Loaded {len(self._keys)} cached question embeddings")
+
+    def make_key(self, question: str) -> str:
+        """
+        Compute the cache key for a question.
+
+        Args:
+            question: The question
+
+        Returns:
+            A hex SHA-256 digest of the query settings and the question
+        """
+        raw_key = f"{self.model_name}|{self.collection_name}|{self.top_k}|{question}"
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached result for a question.
+
+        Args:
+            question: The question
+
+        Returns:
+            The cached result dictionary, or None if the question isn't cached
+        """
+        result = self._get_by_key(self.make_key(question))
+        if result is not None:
+            return result if result["question"] == question else dict(result, question=question)
+        if self.embed is None:
+            return None
+
+        embedding = np.asarray(self.embed(question), dtype=np.float32)
+        key = self._find_similar(embedding)
+        if key is None:
+            with self._lock:
+                self._pending_embeddings[question] = embedding
+            return None
+
+        result = self._get_by_key(key)
+        if result is None:
+            return None
+
+        # None for answers cached before the questions were recorded
+        matched_question = result["question"]
+        logger.info(f"Reusing the cached answer to '{matched_question}' for the similar question '{question}'")
+        return {
+            "question": question,
+            "answer": result["answer"],
+            "metadata": {**result["metadata"], "matched_question": matched_question}
+        }
+
+    def _get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result by its key.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached result dictionary, with the question it was stored for
+            (None if not recorded), or None if the key isn't cached
+        """
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+
+            row = self._connection.execute(
+                "SELECT answer, metadata, question FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            answer, metadata, cached_question = row
+            result = {
+                "question": cached_question,
+                "answer": answer,
+                "metadata": json.loads(metadata)
+            }
+            self._memory[key] = result
+            return result
+
+    def _find_similar(self, embedding: np.ndarray) -> Optional[str]:
+        """
+        Find the cached question most similar to an embedding.
+
+        Args:
+            embedding: The question embedding
+
+        Returns:
+            The cache key of the most similar question, or None if none
+            reaches the similarity threshold
+        """
+        with self._lock:
+            embeddings = self._embeddings
+            keys = self._keys
+        if embeddings is None:
+            return None
+
+        norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(embedding)
+        similarities = (embeddings @ embedding) / np.maximum(norms, 1e-12)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return keys[best]
+
+    def set(self, question: str, result: Dict[str, Any]) -> None:
+        """
+        Store the result for a question.
+
+        Results that carry an error are not cached. Their pending embedding,
+        if any, is dropped.
+
+        Args:
+            question: The question
+            result: The result dictionary returned by QueryProcessor.answer_question
+        """
+        if "error" in result["metadata"]:
+            with self._lock:
+                self._pending_embeddings.pop(question, None)
+            return
+
+        key = self.make_key(question)
+        metadata = json.dumps(result["metadata"]).encode("utf-8")
+        with self._lock:
+            embedding = self._pending_embeddings.pop(question, None)
+        if embedding is None and self.embed is not None:
+            embedding = np.asarray(self.embed(question), dtype=np.float32)
+        embedding_blob = embedding.astype(np.float16).tobytes() if embedding is not None else None
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, answer, metadata, scope, embedding, question, collection) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, result["answer"], metadata, self.scope, embedding_blob, question, self.collection_name)
+                )
+            self._memory[key] = result
+
+            if embedding is not None and key not in self._keys:
+                row = embedding.astype(np.float16).astype(np.float32)[np.newaxis, :]
+                self._embeddings = row if self._embeddings is None else np.vstack([self._embeddings, row])
+                self._keys = self._keys + [key]
+
+    @staticmethod
+    def clear_collection(cache_file: Union[str, Path], collection_name: str) -> int:
+        """
+        Remove the cached answers for a collection whose messages changed.
+
+        Answers cached before the collection was recorded can't be attributed
+        to a collection, so they are removed as well.
+
+        Args:
+            cache_file: Path to the SQLite database file
+            collection_name: Name of the ChromaDB collection
+
+        Returns:
+            The number of removed answers
+        """
+        if not Path(cache_file).exists():
+            return 0
+
+        connection = sqlite3.connect(cache_file)
+        try:
+            _create_schema(connection)
+            with connection:
+                removed = connection.execute(
+                    "DELETE FROM cache WHERE collection = ? OR collection IS NULL", (collection_name,)
+                ).rowcount
+        finally:
+            connection.close()
+
+        if removed:
+            logger.info(f"Removed {removed} cached answers for collection {collection_name}")
+        return removed
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -11,18 +11,139 @@ Available commands:
 - check: Check the status of the ChromaDB collection
 - batch: Process a batch of questions from a file
 - process-queries: Process queries from the 'queries' folder
+- serve: Keep a query processor loaded and answer questions over HTTP
 """
 
 import argparse
-import importlib.util
+import io
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
 
 from telegram_analyzer import config
 from telegram_analyzer.data_processing import load_telegram_messages
-from telegram_analyzer.database import ChromaDBManager, load_into_chromadb
-from telegram_analyzer.logging import logger
-from telegram_analyzer.query import QueryProcessor
+from telegram_analyzer.logging import logger, setup_logging
+from telegram_analyzer.questions_set import load_questions_sets
+
+# ChromaDB, sentence-transformers and their dependencies take seconds to import,
+# so modules depending on them are imported by the handlers that need them
+if TYPE_CHECKING:
+    from telegram_analyzer.cache import AnswerCache
+    from telegram_analyzer.message import Message
+    from telegram_analyzer.query import QueryProcessor
+    from telegram_analyzer.server import RemoteQueryProcessor
+
+# Buffer size for markdown output files, which stay open for a whole run
+OUTPUT_BUFFER_SIZE = 1 << 20
+# Number of answers collected in memory before they are written to the output file
+OUTPUT_FLUSH_EVERY = 8
+# Default number of questions answered concurrently in batch commands
+DEFAULT_CONCURRENCY = 4
+
+
+def _format_section(heading: str, body: str) -> str:
+    """
+    Format a markdown section of an output file.
+
+    Args:
+        heading: The section heading
+        body: The section body
+
+    Returns:
+        The formatted section
+    """
+    return f"## {heading}\n\n{body}\n\n"
+
+
+def _format_answer(result: Dict[str, Any]) -> str:
+    """
+    Format the answer of a result for an output file.
+
+    Answers reused from a similar cached question are marked with that
+    question, so they are not mistaken for answers to the question itself.
+
+    Args:
+        result: The result dictionary of a question
+
+    Returns:
+        The answer text
+    """
+    metadata = result['metadata']
+    if "matched_question" not in metadata:
+        return result['answer']
+
+    matched_question = metadata["matched_question"] or "a similar question"
+    return f"_Cached answer to: {matched_question}_\n\n{result['answer']}"
+
+
+def _write_file_atomic(path: Path, text: str) -> None:
+    """
+    Write a text file so that it is either fully written or left untouched.
+
+    Args:
+        path: Path of the file to write
+        text: The file contents
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class _SectionWriter:
+    """
+    Collects markdown sections in memory and writes them out in groups.
+
+    Sections are written to the output file and flushed every
+    `flush_every` sections, and once more when the writer is closed.
+    """
+
+    def __init__(self, out: TextIO, flush_every: int = OUTPUT_FLUSH_EVERY):
+        """
+        Initialize the _SectionWriter.
+
+        Args:
+            out: The output file
+            flush_every: Number of sections to collect before writing them out
+        """
+        self.out = out
+        self.flush_every = flush_every
+        self._buffer = io.StringIO()
+        self._pending = 0
+
+    def __enter__(self) -> "_SectionWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def write_section(self, heading: str, body: str) -> None:
+        """
+        Add a section to the buffer, writing the buffer out when it is full.
+
+        Args:
+            heading: The section heading
+            body: The section body
+        """
+        self._buffer.write(_format_section(heading, body))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered sections to the output file.
+        """
+        if not self._pending:
+            return
+
+        self.out.write(self._buffer.getvalue())
+        self.out.flush()
+        self._buffer = io.StringIO()
+        self._pending = 0
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -64,6 +185,12 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Don't reset the collection before loading"
     )
+    load_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to filter large exports (0 = one per CPU)"
+    )
 
     # Query command
     query_parser = subparsers.add_parser(
@@ -136,6 +263,21 @@ def create_parser() -> argparse.ArgumentParser:
         default=config.OUTPUT_FILE,
         help="Path to save the answers in markdown format"
     )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of questions to answer concurrently"
+    )
+    batch_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or store answers in the answer cache"
+    )
+    batch_parser.add_argument(
+        "--server",
+        help="URL of a running 'serve' instance to answer the questions with"
+    )
 
     # Process queries command
     process_queries_parser = subparsers.add_parser(
@@ -146,6 +288,10 @@ def create_parser() -> argparse.ArgumentParser:
         "--file",
         help="Specific query file to process (default: process all Python files in the queries folder)"
     )
+    process_queries_parser.add_argument(
+        "--set",
+        help="Name of the query set to process (file name without extension), skips the interactive selection"
+    )
     process_queries_parser.add_argument(
         "--collection",
         default=config.COLLECTION_NAME,
@@ -167,10 +313,244 @@ def create_parser() -> argparse.ArgumentParser:
         default=config.OUTPUT_FILE,
         help="Path to save the answers in markdown format"
     )
+    process_queries_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of questions to answer concurrently"
+    )
+    process_queries_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or store answers in the answer cache"
+    )
+    process_queries_parser.add_argument(
+        "--server",
+        help="URL of a running 'serve' instance to answer the questions with"
+    )
+
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Keep a query processor loaded and answer questions over HTTP"
+    )
+    serve_parser.add_argument(
+        "--collection",
+        default=config.COLLECTION_NAME,
+        help="Name of the ChromaDB collection"
+    )
+    serve_parser.add_argument(
+        "--model",
+        default=config.OLLAMA_MODEL["name"],
+        help="Name of the Ollama model"
+    )
+    serve_parser.add_argument(
+        "--host",
+        default=getattr(config, "SERVER_SETTINGS", {}).get("host", "127.0.0.1"),
+        help="Host to listen on"
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=getattr(config, "SERVER_SETTINGS", {}).get("port", 8765),
+        help="Port to listen on"
+    )
 
     return parser
 
 
+def _create_query_processor(args: argparse.Namespace) -> Union["QueryProcessor", "RemoteQueryProcessor"]:
+    """
+    Create the query processor for a batch command.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        A client for the query server if --server is given, otherwise a local QueryProcessor
+    """
+    if args.server:
+        from telegram_analyzer.server import RemoteQueryProcessor
+        return RemoteQueryProcessor(
+            args.server,
+            collection_name=args.collection,
+            model_name=args.model
+        )
+
+    from telegram_analyzer.query import QueryProcessor
+    return QueryProcessor(
+        collection_name=args.collection,
+        model_name=args.model
+    )
+
+
+def _create_answer_cache(
+        args: argparse.Namespace,
+        processor: Union["QueryProcessor", "RemoteQueryProcessor"]
+) -> Optional["AnswerCache"]:
+    """
+    Create the answer cache for a batch command.
+
+    Similar-question matching needs the embedding model locally, so it is
+    skipped when questions are answered by a query server.
+
+    Args:
+        args: Command-line arguments
+        processor: The query processor the answers come from
+
+    Returns:
+        An AnswerCache instance, or None if caching is disabled
+    """
+    # Configs from before these settings existed leave caching disabled
+    cache_file = getattr(config, "ANSWER_CACHE_FILE", None)
+    similarity_threshold = getattr(config, "ANSWER_CACHE_SIMILARITY", None)
+    if args.no_cache or not cache_file:
+        return None
+
+    from telegram_analyzer.cache import AnswerCache
+
+    if similarity_threshold is None or args.server:
+        return AnswerCache(
+            cache_file=cache_file,
+            collection_name=processor.collection_name,
+            model_name=processor.model_name,
+            top_k=args.top_k
+        )
+
+    from telegram_analyzer.database import ChromaDBManager
+    db_manager = ChromaDBManager(collection_name=processor.collection_name)
+    # Embeddings of different sizes cannot be compared, so truncated ones get their own scope
+    embedding_model_name = db_manager.model_name
+    if db_manager.truncate_dim:
+        embedding_model_name += f"|{db_manager.truncate_dim}"
+    return AnswerCache(
+        cache_file=cache_file,
+        collection_name=processor.collection_name,
+        model_name=processor.model_name,
+        top_k=args.top_k,
+        embed=db_manager.encode_query,
+        embedding_model_name=embedding_model_name,
+        similarity_threshold=similarity_threshold
+    )
+
+
+def _answer_questions(
+        processor: Union["QueryProcessor", "RemoteQueryProcessor"],
+        questions: List[str],
+        top_k: int,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache: Optional["AnswerCache"] = None
+) -> Iterator[Tuple[int, str, Future]]:
+    """
+    Answer questions concurrently, yielding them back in input order.
+
+    Each question is answered on a worker thread, since the work is dominated
+    by ChromaDB and Ollama round-trips. Futures are yielded in the order of
+    the questions, so output can be written sequentially as answers arrive.
+    Questions are submitted only a little ahead of the one being yielded, so
+    closing the generator does not wait for the rest of the batch.
+    Relevant messages for each group of `concurrency` new questions are
+    retrieved in one batch when the processor supports it. Cached and
+    repeated questions are not answered again.
+
+    Args:
+        processor: The query processor used to answer the questions
+        questions: The questions to answer
+        top_k: Number of relevant messages to include in the context
+        concurrency: Maximum number of questions answered at the same time
+        cache: Optional answer cache consulted before answering a question
+
+    Yields:
+        Tuples of (question number, question, future holding the result)
+    """
+    total = len(questions)
+    concurrency = max(1, concurrency)
+    # Local processors retrieve context for a group of questions in one batch;
+    # a query server only answers whole questions
+    retrieve_messages = getattr(processor, "retrieve_messages", None)
+
+    def answer(i: int, question: str, retrieval: Optional[Future], index: int):
+        logger.info(f"Processing question {i}/{total}: '{question}'")
+        relevant_messages = None
+        if retrieval is not None:
+            try:
+                batch_messages, retrieval_time = retrieval.result()
+                relevant_messages = batch_messages[index]
+            except Exception as e:
+                logger.warning(f"Batch retrieval failed, retrieving question {i} on its own: {e}")
+
+        if relevant_messages is None:
+            result = processor.answer_question(question=question, top_k=top_k)
+        else:
+            result = processor.answer_question(
+                question=question,
+                top_k=top_k,
+                relevant_messages=relevant_messages,
+                retrieval_time=retrieval_time
+            )
+        if cache is not None:
+            cache.set(question, result)
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    # A single thread, so retrieval of the next group overlaps generation of the current one
+    retriever = ThreadPoolExecutor(max_workers=1)
+    futures: Dict[str, Future] = {}
+    group: List[Tuple[int, str]] = []
+
+    def retrieve(group_questions: List[str]) -> Tuple[List[List["Message"]], float]:
+        # The group's retrieval time counts towards each of its questions, as in answer_questions
+        start_time = time.time()
+        batch_messages = retrieve_messages(group_questions, top_k)
+        return batch_messages, time.time() - start_time
+
+    def submit_group():
+        if not group:
+            return
+        retrieval = None
+        if retrieve_messages is not None:
+            retrieval = retriever.submit(retrieve, [question for _, question in group])
+        for index, (i, question) in enumerate(group):
+            futures[question] = executor.submit(answer, i, question, retrieval, index)
+        group.clear()
+
+    try:
+        grouped = set()
+        pending = deque()
+        for i, question in enumerate(questions, 1):
+            if question not in futures and question not in grouped:
+                cached_result = cache.get(question) if cache is not None else None
+                if cached_result is not None:
+                    logger.info(f"Using cached answer for question {i}")
+                    futures[question] = Future()
+                    futures[question].set_result(cached_result)
+                else:
+                    grouped.add(question)
+                    group.append((i, question))
+                    if len(group) >= concurrency:
+                        submit_group()
+            pending.append((i, question))
+
+            # Only submit a couple of groups ahead of the question being written
+            if len(pending) > 2 * concurrency:
+                number, head = pending.popleft()
+                if head not in futures:
+                    submit_group()
+                yield number, head, futures[head]
+
+        submit_group()
+        if len(futures) < total:
+            logger.info(f"Skipping {total - len(futures)} duplicate question(s)")
+
+        while pending:
+            number, head = pending.popleft()
+            yield number, head, futures[head]
+    finally:
+        # When the caller stops early (e.g. on Ctrl-C), drop the questions not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
+        retriever.shutdown(wait=False, cancel_futures=True)
+
+
 def handle_load(args: argparse.Namespace) -> int:
     """
     Handle the load command.
@@ -182,8 +562,10 @@ def handle_load(args: argparse.Namespace) -> int:
         Exit code (0 for success, non-zero for failure)
     """
     try:
+        from telegram_analyzer.database import load_into_chromadb
+
         logger.info(f"Loading messages from {args.json_file}")
-        messages = load_telegram_messages(args.json_file)
+        messages = load_telegram_messages(args.json_file, workers=args.workers)
         logger.info(f"Loaded {len(messages)} messages from JSON file")
 
         count = load_into_chromadb(
@@ -211,6 +593,8 @@ def handle_query(args: argparse.Namespace) -> int:
         Exit code (0 for success, non-zero for failure)
     """
     try:
+        from telegram_analyzer.query import QueryProcessor
+
         processor = QueryProcessor(
             collection_name=args.collection,
             model_name=args.model
@@ -256,6 +640,8 @@ def handle_check(args: argparse.Namespace) -> int:
         Exit code (0 for success, non-zero for failure)
     """
     try:
+        from telegram_analyzer.database import ChromaDBManager
+
         db_manager = ChromaDBManager(collection_name=args.collection)
         info = db_manager.get_collection_info()
 
@@ -306,36 +692,29 @@ def handle_batch(args: argparse.Namespace) -> int:
             logger.info(f"Created new output file: {output_path}")
 
         # Initialize query processor
-        processor = QueryProcessor(
-            collection_name=args.collection,
-            model_name=args.model
-        )
-
-        # Process each question
-        for i, question in enumerate(questions, 1):
-            logger.info(f"Processing question {i}/{len(questions)}: '{question}'")
+        processor = _create_query_processor(args)
+        cache = _create_answer_cache(args, processor)
 
-            try:
-                result = processor.answer_question(
-                    question=question,
-                    top_k=args.top_k
-                )
+        # Process each question, keeping the output file open for the whole run
+        with open(output_path, "a", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as out, \
+                _SectionWriter(out) as sections:
+            for i, question, future in _answer_questions(processor, questions, args.top_k, args.concurrency, cache):
+                try:
+                    result = future.result()
 
-                # Append the answer to the output file
-                with open(output_path, "a", encoding="utf-8") as f:
-                    f.write(f"## {question}\n\n{result['answer']}\n\n")
+                    # Append the answer to the output file
+                    sections.write_section(question, _format_answer(result))
 
-                logger.info(f"Answer for question {i} saved to {output_path}")
+                    logger.info(f"Answer for question {i} written to {output_path}")
 
-                # Print progress
-                print(f"Processed {i}/{len(questions)}: '{question[:50]}...' ({result['metadata']['processing_time']:.2f}s)")
+                    # Print progress
+                    print(f"Processed {i}/{len(questions)}: '{question[:50]}...' ({result['metadata']['processing_time']:.2f}s)")
 
-            except Exception as e:
-                logger.error(f"Error processing question {i}: {e}", exc_info=True)
+                except Exception as e:
+                    logger.error(f"Error processing question {i}: {e}", exc_info=True)
 
-                # Append the error to the output file
-                with open(output_path, "a", encoding="utf-8") as f:
-                    f.write(f"## {question}\n\nError: {str(e)}\n\n")
+                    # Append the error to the output file
+                    sections.write_section(question, f"Error: {str(e)}")
 
         logger.info(f"All questions processed. Results saved to {output_path}")
         return 0
@@ -378,26 +757,11 @@ def handle_process_queries(args: argparse.Namespace) -> int:
                 return 1
             query_files = [file_path]
 
-        # Dictionary to store query sets
-        query_sets = {}
-
         # Load all query sets
-        for query_file in query_files:
-            try:
-                # Import the module dynamically
-                module_name = query_file.stem
-                spec = importlib.util.spec_from_file_location(module_name, query_file)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                # Extract questionsSet from the module
-                if hasattr(module, "questions_set"):
-                    query_sets[module_name] = module.questions_set
-                    logger.info(f"Found query set '{module.questions_set.title}' in {query_file}")
-                else:
-                    logger.warning(f"No 'questionsSet' found in {query_file}")
-            except Exception as e:
-                logger.error(f"Error loading query file {query_file}: {e}", exc_info=True)
+        query_sets = load_questions_sets(
+            query_files,
+            cache_file=getattr(config, "QUERY_SETS_CACHE_FILE", None)
+        )
 
         if not query_sets:
             logger.error("No valid query sets found")
@@ -405,7 +769,13 @@ def handle_process_queries(args: argparse.Namespace) -> int:
 
         # If no specific file was provided, let the user select a query set
         selected_set = None
-        if not args.file:
+        if args.set:
+            if args.set not in query_sets:
+                logger.error(f"Query set not found: {args.set} (available: {', '.join(query_sets)})")
+                return 1
+            selected_name = args.set
+            selected_set = query_sets[selected_name]
+        elif not args.file:
             print("\nAvailable query sets:")
             for i, (name, query_set) in enumerate(query_sets.items(), 1):
                 print(f"{i}. {query_set.title} ({name})")
@@ -433,10 +803,8 @@ def handle_process_queries(args: argparse.Namespace) -> int:
             selected_set = query_sets[selected_name]
 
         # Initialize query processor
-        processor = QueryProcessor(
-            collection_name=args.collection,
-            model_name=args.model
-        )
+        processor = _create_query_processor(args)
+        cache = _create_answer_cache(args, processor)
 
         # Create a timestamp for the filename
         from datetime import datetime
@@ -446,42 +814,40 @@ def handle_process_queries(args: argparse.Namespace) -> int:
         output_filename = f"{selected_name}_results_{timestamp}.md"
         output_path = Path(output_filename)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(f"# {selected_set.title}\n\n")
-            f.write(f"{selected_set.description}\n\n")
-            f.write(f"Analysis date: {timestamp}\n\n")
-
-        logger.info(f"Created output file: {output_path}")
-
         total_queries = len(selected_set.questions)
         processed_queries = 0
 
-        # Process each question in the selected query set
-        for i, question in enumerate(selected_set.questions, 1):
-            logger.info(f"Processing question {i}/{total_queries}: '{question}'")
-
-            try:
-                result = processor.answer_question(
-                    question=question,
-                    top_k=args.top_k
-                )
+        # The whole report is kept in memory and written in one go at the end,
+        # including when processing is interrupted
+        lines = [
+            f"# {selected_set.title}\n\n",
+            f"{selected_set.description}\n\n",
+            f"Analysis date: {timestamp}\n\n"
+        ]
+        logger.info(f"Results will be saved to {output_path}")
+
+        try:
+            # Process each question in the selected query set
+            for i, question, future in _answer_questions(processor, selected_set.questions, args.top_k, args.concurrency, cache):
+                try:
+                    result = future.result()
 
-                # Append the answer to the output file
-                with open(output_path, "a", encoding="utf-8") as f:
-                    f.write(f"## {question}\n\n{result['answer']}\n\n")
+                    # Add the answer to the report
+                    lines.append(_format_section(question, _format_answer(result)))
 
-                logger.info(f"Answer for question {i} saved to {output_path}")
-                processed_queries += 1
+                    logger.info(f"Answer for question {i} added to the report")
+                    processed_queries += 1
 
-                # Print progress
-                print(f"Processed {i}/{total_queries}: '{question[:50]}...' ({result['metadata']['processing_time']:.2f}s)")
+                    # Print progress
+                    print(f"Processed {i}/{total_queries}: '{question[:50]}...' ({result['metadata']['processing_time']:.2f}s)")
 
-            except Exception as e:
-                logger.error(f"Error processing question {i}: {e}", exc_info=True)
+                except Exception as e:
+                    logger.error(f"Error processing question {i}: {e}", exc_info=True)
 
-                # Append the error to the output file
-                with open(output_path, "a", encoding="utf-8") as f:
-                    f.write(f"## {question}\n\nError: {str(e)}\n\n")
+                    # Add the error to the report
+                    lines.append(_format_section(question, f"Error: {str(e)}"))
+        finally:
+            _write_file_atomic(output_path, "".join(lines))
 
         logger.info(f"Query set processed. Processed {processed_queries}/{total_queries} questions. Results saved to {output_path}")
         return 0
@@ -491,6 +857,31 @@ def handle_process_queries(args: argparse.Namespace) -> int:
         return 1
 
 
+def handle_serve(args: argparse.Namespace) -> int:
+    """
+    Handle the serve command.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    try:
+        from telegram_analyzer.query import QueryProcessor
+        from telegram_analyzer.server import serve
+
+        processor = QueryProcessor(
+            collection_name=args.collection,
+            model_name=args.model
+        )
+        serve(processor, host=args.host, port=args.port)
+        return 0
+    except Exception as e:
+        logger.error(f"Error in serve command: {e}", exc_info=True)
+        return 1
+
+
 def main() -> int:
     """
     Main entry point for the CLI.
@@ -500,6 +891,7 @@ def main() -> int:
     """
     parser = create_parser()
     args = parser.parse_args()
+    setup_logging()
 
     if args.command is None:
         parser.print_help()
@@ -510,7 +902,8 @@ def main() -> int:
         "query": handle_query,
         "check": handle_check,
         "batch": handle_batch,
-        "process-queries": handle_process_queries
+        "process-queries": handle_process_queries,
+        "serve": handle_serve
     }
 
     handler = command_handlers.get(args.command)
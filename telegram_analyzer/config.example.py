@@ -30,10 +30,24 @@ CHROMADB_SETTINGS: Dict[str, Any] = {
 }
 # Name of the collection in ChromaDB where telegram messages will be stored
 COLLECTION_NAME: str = "telegram_messages"
+# HNSW index settings, applied when a collection is created (reload to change them)
+# These keys are honoured by chromadb 0.4.19 and later, including the 1.x releases
+HNSW_SETTINGS: Dict[str, Any] = {
+    # Distance metric; embeddings are unit-length, so cosine matches the model's similarity
+    "hnsw:space": "cosine",
+    # Number of neighbours per node: higher improves recall but uses more memory
+    "hnsw:M": 24,
+    # Candidates considered while building the index: higher improves recall but slows loading
+    "hnsw:construction_ef": 128,
+    # Candidates considered while searching: higher improves recall but slows queries
+    "hnsw:search_ef": 100,
+    # Number of vectors buffered before the index is written to disk
+    "hnsw:sync_threshold": 50000
+}
 
 # Sentence Transformer model settings
 # These settings control which embedding model is used and how it's run
-SENTENCE_MODEL: Dict[str, str] = {
+SENTENCE_MODEL: Dict[str, Any] = {
     # The model to use for generating embeddings
     # You can use other models from https://huggingface.co/models?library=sentence-transformers
     "name": "mixedbread-ai/mxbai-embed-large-v1",
@@ -41,7 +55,17 @@ SENTENCE_MODEL: Dict[str, str] = {
     # - 'cpu': Use CPU (works on all systems but slower)
     # - 'cuda': Use NVIDIA GPU (requires CUDA setup)
     # - 'mps': Use Apple Silicon GPU (for M1/M2/... Macs)
-    "device": "mps"
+    "device": "mps",
+    # Number of embedding dimensions to keep (None keeps all of them)
+    # Models trained with Matryoshka loss (like mxbai-embed-large-v1) keep most
+    # of their accuracy when truncated, e.g. 512 halves the size of the database
+    # The collection must be reloaded after changing this value
+    "truncate_dim": None,
+    # Inference backend for the model (onnx and openvino need sentence-transformers 3.2+):
+    # - 'torch': PyTorch (runs in half precision on CUDA)
+    # - 'onnx': ONNX Runtime, usually faster on CPU (pip install "sentence-transformers[onnx]")
+    # - 'openvino': OpenVINO, for Intel CPUs (pip install "sentence-transformers[openvino]")
+    "backend": "torch"
 }
 
 # Query settings
@@ -58,6 +82,10 @@ OLLAMA_MODEL: Dict[str, Any] = {
     # The name of the model to use
     # You can see available models with "ollama list"
     "name": "deepseek-r1:32b-qwen-distill-q8_0",
+    # Address of the Ollama server (None uses the OLLAMA_HOST environment variable or localhost)
+    "host": None,
+    # How long Ollama keeps the model loaded after a request, so later questions skip reloading it
+    "keep_alive": "1h",
     # Model generation options
     "options": {
         # Controls randomness: higher values (e.g., 0.8) make output more random,
@@ -72,10 +100,33 @@ OLLAMA_MODEL: Dict[str, Any] = {
     }
 }
 
+# Query server settings
+# Address the "serve" command listens on; batch commands connect to it with --server
+SERVER_SETTINGS: Dict[str, Any] = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    # Seconds the batch commands wait for each answer from the server (None waits indefinitely)
+    "timeout": 600
+}
+
 # Output settings
 # Default file path for saving analysis results
 OUTPUT_FILE: str = str(BASE_DIR / "telegram_analysis_results.md")
 
+# Cache settings
+# SQLite file where answers from the batch and process-queries commands are cached,
+# so repeated questions with the same model, collection and top-k are not re-evaluated
+# (set to None to disable caching)
+ANSWER_CACHE_FILE: Optional[str] = str(BASE_DIR / "answer_cache.sqlite")
+# Minimum cosine similarity between question embeddings for a cached answer
+# to be reused for a differently worded question, e.g. 0.86 (None only reuses exact matches)
+# Templated questions that differ in a single topic can be this similar, so reused
+# answers are marked with the question they were given for
+ANSWER_CACHE_SIMILARITY: Optional[float] = None
+# Pickle file caching the query sets loaded from the queries folder; a query file
+# is only imported again after it changes (set to None to always import them)
+QUERY_SETS_CACHE_FILE: Optional[str] = str(Path.home() / ".cache" / "telegram_analyzer" / "query_sets.pkl")
+
 # Logging settings
 # Log level determines which messages are recorded (DEBUG, INFO, WARNING, ERROR, CRITICAL)
 LOG_LEVEL: str = "INFO"
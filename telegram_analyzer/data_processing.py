@@ -6,86 +6,312 @@ from JSON export files.
 """
 
 import json
+import mmap
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Any, Tuple, Union
+
+import ijson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from telegram_analyzer.logging import logger
 
+# Exports with fewer raw entries than this are filtered in-process,
+# since starting worker processes would cost more than it saves
+PARALLEL_THRESHOLD = 50_000
+# Number of raw entries sent to a worker process at a time
+PARALLEL_CHUNK_SIZE = 10_000
+# Exports up to this size are decoded in one go with orjson (when installed),
+# larger ones are parsed incrementally to bound memory use
+FULL_PARSE_MAX_BYTES = 128 * 1024 * 1024
+
+# Type of the export entries that hold chat messages
+_MESSAGE_TYPE = 'message'
+
+# A processed message as (id, text, Unix timestamp)
+MessageRow = Tuple[str, str, int]
+# A message with an invalid date as (id, raw date_unixtime value)
+InvalidDate = Tuple[Any, Any]
+
+
+@dataclass
+class MessageColumns:
+    """
+    Column-oriented container for processed Telegram messages.
+
+    Each field is a parallel list, so a contiguous range of messages can be
+    sliced out and handed to ChromaDB without building per-message objects.
+
+    Attributes:
+        ids: The message IDs
+        texts: The message texts
+        dates: The message dates (Unix timestamps)
+    """
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    dates: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, msg_id: str, text: str, date: int) -> None:
+        """
+        Append a processed message to the columns.
+
+        Args:
+            msg_id: The message ID
+            text: The message text
+            date: The message date (Unix timestamp)
+        """
+        self.ids.append(msg_id)
+        self.texts.append(text)
+        self.dates.append(date)
+
+    def slice(self, start: int, stop: int) -> 'MessageColumns':
+        """
+        Get a contiguous range of messages.
+
+        Args:
+            start: Index of the first message
+            stop: Index after the last message
+
+        Returns:
+            A new MessageColumns instance with the selected messages
+        """
+        return MessageColumns(
+            ids=self.ids[start:stop],
+            texts=self.texts[start:stop],
+            dates=self.dates[start:stop]
+        )
+
 
 class TelegramDataProcessor:
     """
     Class for processing Telegram chat data from JSON export files.
+
+    This is a thin wrapper around iter_messages that collects its output
+    into columns.
     """
 
-    def __init__(self, json_file: Union[str, Path]):
+    def __init__(self, json_file: Union[str, Path], workers: int = 1):
         """
         Initialize the TelegramDataProcessor.
 
         Args:
             json_file: Path to the Telegram chat JSON export file
+            workers: Number of worker processes used to filter large exports;
+                0 means one per CPU
         """
         self.json_file = Path(json_file)
+        self.workers = workers or os.cpu_count() or 1
         if not self.json_file.exists():
             raise FileNotFoundError(f"JSON file not found: {self.json_file}")
         logger.info(f"Initialized TelegramDataProcessor with file: {self.json_file}")
 
-    def load_messages(self) -> List[Dict[str, Any]]:
+    def load_messages(self) -> MessageColumns:
         """
         Load and process messages from the Telegram chat JSON export file.
 
         Returns:
-            A list of processed message dictionaries with standardized fields
+            The processed messages in column-oriented form
         """
         logger.info(f"Loading messages from {self.json_file}")
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            messages = []
-            for msg in data.get('messages', []):
-                processed_msg = self._process_message(msg)
-                
-                if processed_msg and processed_msg['text']:
-                    messages.append(processed_msg)
+            messages = MessageColumns()
+            append = messages.append
+            for msg_id, text, date in iter_messages(self.json_file, workers=self.workers):
+                append(msg_id, text, date)
 
             logger.info(f"Successfully loaded {len(messages)} messages")
             return messages
-        except json.JSONDecodeError as e:
+        except (ijson.JSONError, json.JSONDecodeError) as e:
             logger.error(f"Error decoding JSON file: {e}")
             raise
         except Exception as e:
             logger.error(f"Error loading messages: {e}")
             raise
 
-    def _process_message(self, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """
-        Process a single message from the Telegram chat data.
 
-        Args:
-            msg: The raw message dictionary from the JSON data
+def iter_messages(json_file: Union[str, Path], workers: int = 1) -> Iterator[MessageRow]:
+    """
+    Iterate over the text messages in a Telegram chat JSON export file.
+
+    When more than one worker is requested, large exports are filtered in
+    chunks across a pool of worker processes.
+
+    Args:
+        json_file: Path to the Telegram chat JSON export file
+        workers: Number of worker processes used to filter large exports
+
+    Yields:
+        Processed messages as (id, text, date) tuples, in file order
+    """
+    raw_messages = _iter_raw_messages(json_file)
+    head = list(islice(raw_messages, PARALLEL_THRESHOLD))
+    invalid_dates: List[InvalidDate] = []
+
+    if workers > 1 and len(head) == PARALLEL_THRESHOLD:
+        logger.info(f"Filtering messages with {workers} worker processes")
+        chunks = chain([head], _iter_chunks(raw_messages, PARALLEL_CHUNK_SIZE))
+        yield from _filter_parallel(chunks, workers, invalid_dates)
+    else:
+        yield from _filter_messages(chain(head, raw_messages), invalid_dates)
+
+    # Reported once per export, however many chunks it was filtered in
+    if invalid_dates:
+        msg_id, value = invalid_dates[0]
+        logger.warning(f"Invalid date in message {msg_id}: {value!r}, using 0")
+    if len(invalid_dates) > 1:
+        logger.warning(f"{len(invalid_dates)} messages had an invalid date and were stored with date 0")
+
+
+def _iter_raw_messages(json_file: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the raw entries of a Telegram chat JSON export file.
+
+    Exports up to FULL_PARSE_MAX_BYTES are memory-mapped and decoded at once
+    with orjson, which is several times faster than incremental parsing.
+    Larger exports, or any export when orjson is not installed, are parsed
+    incrementally with ijson so only the current entry is kept in memory.
+
+    Args:
+        json_file: Path to the Telegram chat JSON export file
+
+    Yields:
+        Raw message dictionaries from the JSON data
+    """
+    with open(json_file, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if orjson is not None and 0 < file_size <= FULL_PARSE_MAX_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = orjson.loads(view)
+            yield from data.get('messages', [])
+        else:
+            yield from ijson.items(f, 'messages.item')
+
+
+def _filter_messages(
+        raw_messages: Iterable[Dict[str, Any]],
+        invalid_dates: List[InvalidDate]
+) -> Iterator[MessageRow]:
+    """
+    Process raw messages, skipping the ones that should not be loaded.
+
+    Service entries, messages with formatted (non-string) text and messages
+    without any text are skipped. Messages with an invalid date are stored
+    with date 0 and recorded in invalid_dates.
+
+    Args:
+        raw_messages: Raw message dictionaries from the JSON data
+        invalid_dates: List the messages with an invalid date are appended to
+
+    Yields:
+        Processed messages as (id, text, date) tuples
+    """
+    # Local names avoid global lookups in the per-message loop
+    _isinstance = isinstance
+    _str = str
+    _int = int
+    message_type = _MESSAGE_TYPE
+
+    for msg in raw_messages:
+        get = msg.get
+        text = get('text')
+        # Skip non-message types, formatted (non-string) text and blank text;
+        # isspace() checks for content without building a stripped copy
+        if get('type') != message_type or not _isinstance(text, _str) or not text or text.isspace():
+            continue
+
+        try:
+            date = _int(get('date_unixtime') or 0)
+        except (TypeError, ValueError):
+            invalid_dates.append((get('id'), get('date_unixtime')))
+            date = 0
+
+        yield _str(get('id', '')), text, date
 
-        Returns:
-            A processed message dictionary or None if the message should be skipped
-        """
-        # Skip non-message types or messages without text
-        if msg.get('type') != 'message' or not isinstance(msg.get('text'), str):
-            return None
 
-        # Extract and standardize message fields
-        processed_msg = {
-            'id': str(msg.get('id', '')),
-            'text': msg.get('text', ''),
-            'date': msg.get('date_unixtime', '')
-        }
+def _filter_chunk(raw_messages: List[Dict[str, Any]]) -> Tuple[List[MessageRow], List[InvalidDate]]:
+    """
+    Process a chunk of raw messages in a worker process.
+
+    Args:
+        raw_messages: Raw message dictionaries from the JSON data
+
+    Returns:
+        A list of processed messages as (id, text, date) tuples, and the
+        messages of the chunk with an invalid date
+    """
+    invalid_dates: List[InvalidDate] = []
+    return list(_filter_messages(raw_messages, invalid_dates)), invalid_dates
+
+
+def _filter_parallel(
+        chunks: Iterable[List[Dict[str, Any]]],
+        workers: int,
+        invalid_dates: List[InvalidDate]
+) -> Iterator[MessageRow]:
+    """
+    Filter chunks of raw messages in a pool of worker processes.
+
+    At most two chunks per worker are in flight at a time, so the export
+    is still consumed incrementally. Results are yielded in input order.
+
+    Args:
+        chunks: Lists of raw message dictionaries from the JSON data
+        workers: Number of worker processes
+        invalid_dates: List the messages with an invalid date are appended to
+
+    Yields:
+        Processed messages as (id, text, date) tuples
+    """
+    def collect(future: Future) -> List[MessageRow]:
+        rows, chunk_invalid_dates = future.result()
+        invalid_dates.extend(chunk_invalid_dates)
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_filter_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
 
-        # Skip empty messages
-        if not processed_msg['text'].strip():
-            return None
 
-        return processed_msg
+def _iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        items: The items to split
+        size: Maximum number of items per chunk
+
+    Yields:
+        Lists of consecutive items
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
-def load_telegram_messages(json_file: Union[str, Path]) -> List[Dict[str, Any]]:
+def load_telegram_messages(
+        json_file: Union[str, Path],
+        workers: int = 1
+) -> MessageColumns:
     """
     Load and process messages from a Telegram chat JSON export file.
 
@@ -94,9 +320,11 @@ def load_telegram_messages(json_file: Union[str, Path]) -> List[Dict[str, Any]]:
 
     Args:
         json_file: Path to the Telegram chat JSON export file
+        workers: Number of worker processes used to filter large exports;
+            0 means one per CPU
 
     Returns:
-        A list of processed message dictionaries with standardized fields
+        The processed messages in column-oriented form
     """
-    processor = TelegramDataProcessor(json_file)
+    processor = TelegramDataProcessor(json_file, workers=workers)
     return processor.load_messages()
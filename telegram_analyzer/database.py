@@ -5,18 +5,175 @@ This module provides functionality for interacting with ChromaDB,
 including loading data, querying, and managing collections.
 """
 import os
-from pathlib import Path
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 import chromadb
+import numpy as np
+import sentence_transformers
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
 from telegram_analyzer import config
+from telegram_analyzer.cache import AnswerCache
+from telegram_analyzer.data_processing import MessageColumns
 from telegram_analyzer.logging import logger
 from telegram_analyzer.message import Message
 
 
+# Number of messages per page fetched when building a collection timeline
+TIMELINE_PAGE_SIZE = 50_000
+# Maximum number of timeline pages fetched at the same time
+TIMELINE_FETCH_WORKERS = 8
+
+# Guards the client and model factories, so concurrent managers share one instance
+_FACTORY_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _get_client(persist_directory: str) -> chromadb.ClientAPI:
+    """
+    Get the ChromaDB client for a persist directory, creating it on first use.
+
+    Args:
+        persist_directory: Directory for ChromaDB persistence
+
+    Returns:
+        The shared ChromaDB client
+    """
+    client = chromadb.Client(Settings(
+        is_persistent=True,
+        persist_directory=persist_directory
+    ))
+    logger.info("ChromaDB client initialized")
+    return client
+
+
+@lru_cache(maxsize=4)
+def _get_model(
+        model_name: str,
+        device: str,
+        truncate_dim: Optional[int],
+        backend: str = "torch"
+) -> SentenceTransformer:
+    """
+    Get a sentence transformer model, loading it on first use.
+
+    Loading the model weights takes much longer than a query, so the model
+    is shared by every ChromaDBManager in the process. PyTorch models on
+    CUDA are converted to half precision, which halves their memory traffic.
+
+    Args:
+        model_name: Name of the sentence transformer model
+        device: Device to use for the model (cpu, cuda, mps)
+        truncate_dim: Number of embedding dimensions to keep, or None to keep all
+        backend: Inference backend for the model (torch, onnx, openvino)
+
+    Returns:
+        The shared sentence transformer model
+
+    Raises:
+        ValueError: If the backend isn't supported by the installed sentence-transformers
+    """
+    model_kwargs: Dict[str, Any] = {"device": device, "truncate_dim": truncate_dim}
+    # Only passed when needed, since older sentence-transformers releases lack it
+    if backend != "torch":
+        version = re.match(r"(\d+)\.(\d+)", sentence_transformers.__version__)
+        if version is None or tuple(map(int, version.groups())) < (3, 2):
+            raise ValueError(
+                f"The {backend} backend requires sentence-transformers 3.2 or newer, "
+                f"found {sentence_transformers.__version__}"
+            )
+        model_kwargs["backend"] = backend
+
+    model = SentenceTransformer(model_name, **model_kwargs)
+    if backend == "torch" and device.startswith("cuda"):
+        model.half()
+    logger.info(f"Sentence transformer model initialized: {model_name} on {device} ({backend})")
+    if truncate_dim:
+        logger.info(f"Embeddings truncated to {truncate_dim} dimensions")
+    return model
+
+
+@dataclass
+class _MessageTimeline:
+    """
+    In-memory index of a collection's message IDs sorted by date.
+
+    It lets context messages be located with a binary search and fetched by
+    ID, instead of scanning the collection with metadata range filters.
+
+    Attributes:
+        count: Number of messages in the collection when the index was built
+        timestamps: Message dates (Unix timestamps), sorted
+        ids: Message IDs, in the same order as timestamps
+    """
+    count: int
+    timestamps: np.ndarray
+    ids: np.ndarray
+
+
+# Timelines by (persist directory, collection name), shared by all managers
+_TIMELINES: Dict[Tuple[str, str], _MessageTimeline] = {}
+_TIMELINES_LOCK = threading.Lock()
+# Held while a timeline is built, so concurrent queries build it only once
+_TIMELINE_BUILD_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+
+
+def _drop_blank_messages(messages: MessageColumns) -> MessageColumns:
+    """
+    Remove messages without any text, so they are not sent to the encoder.
+
+    Messages loaded from an export are already filtered; this guards
+    columns built by other callers.
+
+    Args:
+        messages: Processed messages to load
+
+    Returns:
+        The messages with non-blank text (the same instance if there were no blank ones)
+    """
+    keep = [i for i, text in enumerate(messages.texts) if text and not text.isspace()]
+    if len(keep) == len(messages):
+        return messages
+
+    logger.warning(f"Skipping {len(messages) - len(keep)} messages without text")
+    return MessageColumns(
+        ids=[messages.ids[i] for i in keep],
+        texts=[messages.texts[i] for i in keep],
+        dates=[messages.dates[i] for i in keep]
+    )
+
+
+def _dir_size(path: str) -> int:
+    """
+    Get the total size of the files in a directory tree.
+
+    os.scandir entries carry their file type, and on most platforms their
+    stat result, so this avoids the Path objects and extra stat calls of a
+    glob walk. Symlinks are not followed.
+
+    Args:
+        path: The directory to measure
+
+    Returns:
+        The total size in bytes
+    """
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _dir_size(entry.path)
+    return total
+
+
 class ChromaDBManager:
     """
     Class for managing ChromaDB operations.
@@ -27,7 +184,9 @@ class ChromaDBManager:
             persist_directory: Optional[str] = None,
             collection_name: str = config.COLLECTION_NAME,
             model_name: str = config.SENTENCE_MODEL["name"],
-            device: str = config.SENTENCE_MODEL["device"]
+            device: str = config.SENTENCE_MODEL["device"],
+            truncate_dim: Optional[int] = config.SENTENCE_MODEL.get("truncate_dim"),
+            backend: str = config.SENTENCE_MODEL.get("backend", "torch")
     ):
         """
         Initialize the ChromaDBManager.
@@ -37,26 +196,26 @@ class ChromaDBManager:
             collection_name: Name of the ChromaDB collection
             model_name: Name of the sentence transformer model
             device: Device to use for the model (cpu, cuda, mps)
+            truncate_dim: Number of embedding dimensions to keep, or None to keep all
+            backend: Inference backend for the model (torch, onnx, openvino)
         """
         self.persist_directory = persist_directory or config.CHROMADB_SETTINGS["persist_directory"]
         self.collection_name = collection_name
         self.model_name = model_name
         self.device = device
+        self.truncate_dim = truncate_dim
+        self.backend = backend
 
         # Ensure the persist directory exists
         os.makedirs(self.persist_directory, exist_ok=True)
         logger.info(f"Using persist directory: {self.persist_directory}")
 
-        # Initialize client
-        self.client = chromadb.Client(Settings(
-            is_persistent=True,
-            persist_directory=self.persist_directory
-        ))
-        logger.info("ChromaDB client initialized")
+        with _FACTORY_LOCK:
+            # Initialize client
+            self.client = _get_client(self.persist_directory)
 
-        # Initialize model
-        self.model = SentenceTransformer(self.model_name, device=self.device)
-        logger.info(f"Sentence transformer model initialized: {self.model_name} on {self.device}")
+            # Initialize model
+            self.model = _get_model(self.model_name, self.device, self.truncate_dim, self.backend)
 
     def get_or_create_collection(self, reset: bool = False) -> chromadb.Collection:
         """
@@ -71,17 +230,29 @@ class ChromaDBManager:
         if reset:
             try:
                 self.client.delete_collection(self.collection_name)
+                self._drop_timeline()
                 logger.info(f"Deleted existing collection: {self.collection_name}")
             except Exception as e:
                 logger.warning(f"Could not delete collection {self.collection_name}: {e}")
 
-        collection = self.client.get_or_create_collection(name=self.collection_name)
+        # Only new collections get the index settings: get_or_create_collection would
+        # overwrite the metadata of an existing one, including its distance metric
+        try:
+            collection = self.client.get_collection(name=self.collection_name)
+        except Exception:
+            # Missing collections raise ValueError or NotFoundError depending on the chromadb version
+            collection = self.client.create_collection(
+                name=self.collection_name,
+                # chromadb rejects empty metadata, so missing settings mean its defaults
+                metadata=dict(getattr(config, "HNSW_SETTINGS", {})) or None
+            )
+            logger.info(f"Created collection: {self.collection_name}")
         logger.info(f"Using collection: {self.collection_name}")
         return collection
 
     def load_messages(
             self,
-            messages: List[Dict[str, Any]],
+            messages: MessageColumns,
             batch_size: int = 5000,
             reset_collection: bool = True
     ) -> int:
@@ -89,7 +260,7 @@ class ChromaDBManager:
         Load messages into ChromaDB.
 
         Args:
-            messages: List of message dictionaries to load
+            messages: Processed messages to load
             batch_size: Number of messages to process in each batch
             reset_collection: If True, reset the collection before loading
 
@@ -97,44 +268,61 @@ class ChromaDBManager:
             The number of messages loaded
         """
         collection = self.get_or_create_collection(reset=reset_collection)
+        # Answers cached for the previous contents of the collection are stale
+        cache_file = getattr(config, "ANSWER_CACHE_FILE", None)
+        if cache_file:
+            AnswerCache.clear_collection(cache_file, self.collection_name)
+        messages = _drop_blank_messages(messages)
         total_messages = len(messages)
         logger.info(f"Loading {total_messages} messages into ChromaDB")
 
+        total_batches = (total_messages + batch_size - 1) // batch_size
+        pool = self._start_encode_pool()
+        # Encodes the next batch while the current one is written to ChromaDB
+        encoder = ThreadPoolExecutor(max_workers=1)
+
+        def encode_batch(start: int) -> Future:
+            logger.info(f"Generating embeddings for batch {start // batch_size + 1}")
+            return encoder.submit(self._encode_documents, messages.texts[start:start + batch_size], pool)
+
         try:
+            running_total = 0
+            next_embeddings = encode_batch(0) if total_messages else None
             for i in range(0, total_messages, batch_size):
-                batch_messages = messages[i:i + batch_size]
+                batch_messages = messages.slice(i, i + batch_size)
                 batch_num = i // batch_size + 1
-                total_batches = (total_messages + batch_size - 1) // batch_size
 
                 logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch_messages)} messages)")
 
                 # Prepare batch data
-                texts = [msg['text'] for msg in batch_messages]
-                ids = [str(msg['id']) for msg in batch_messages]  # Convert numeric IDs to strings for the batch
+                texts = batch_messages.texts
+                ids = batch_messages.ids
                 metadatas = [
                     {
-                        "date": int(msg["date"])
+                        "date": date
                     }
-                    for msg in batch_messages
+                    for date in batch_messages.dates
                 ]
 
-                # Generate embeddings
-                logger.info(f"Generating embeddings for batch {batch_num}")
-                embeddings = self.model.encode(texts, show_progress_bar=True)
+                # Wait for the embeddings and start on the next batch
+                embeddings = next_embeddings.result()
+                if i + batch_size < total_messages:
+                    next_embeddings = encode_batch(i + batch_size)
 
-                # Add to collection
+                # Add to collection; ChromaDB takes the float32 array as is,
+                # so no per-float Python objects are created
                 collection.add(
                     documents=texts,
-                    embeddings=embeddings.tolist(),
+                    embeddings=np.ascontiguousarray(embeddings, dtype=np.float32),
                     metadatas=metadatas,
                     ids=ids
                 )
 
-                # Verify batch
-                count = collection.count()
-                logger.info(f"Batch {batch_num} loaded. Current collection count: {count}")
+                running_total += len(batch_messages)
+                logger.info(f"Batch {batch_num} loaded. Messages loaded so far: {running_total}")
 
             # Final verification
+            self._drop_timeline()
             final_count = collection.count()
             logger.info(f"Successfully loaded {final_count} messages into collection {self.collection_name}")
 
@@ -143,6 +331,81 @@ class ChromaDBManager:
         except Exception as e:
             logger.error(f"Error loading messages into ChromaDB: {e}", exc_info=True)
             raise
+        finally:
+            encoder.shutdown(wait=True, cancel_futures=True)
+            if pool is not None:
+                self.model.stop_multi_process_pool(pool)
+
+    def _start_encode_pool(self) -> Optional[Dict[str, Any]]:
+        """
+        Start one encoding process per GPU when more than one is available.
+
+        Returns:
+            The multi-process pool, or None when encoding runs on a single device
+        """
+        if not self.device.startswith("cuda") or torch.cuda.device_count() < 2:
+            return None
+
+        logger.info(f"Encoding on {torch.cuda.device_count()} GPUs")
+        return self.model.start_multi_process_pool()
+
+    def _encode_documents(self, texts: List[str], pool: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Generate the unit-length embeddings of message texts.
+
+        Args:
+            texts: The message texts
+            pool: Multi-process pool from _start_encode_pool, or None to encode in this process
+
+        Returns:
+            An array with one embedding row per text
+        """
+        if pool is not None:
+            return self.model.encode_multi_process(
+                texts,
+                pool,
+                batch_size=64,
+                chunk_size=1000,
+                normalize_embeddings=True
+            )
+
+        return self.model.encode(
+            texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=True
+        )
+
+    def encode_query(self, query_text: str) -> np.ndarray:
+        """
+        Generate the embedding of a query text.
+
+        Args:
+            query_text: The query text
+
+        Returns:
+            The query embedding
+        """
+        return self.encode_queries([query_text])[0]
+
+    def encode_queries(self, query_texts: List[str]) -> np.ndarray:
+        """
+        Generate the unit-length embeddings of several query texts in one batch.
+
+        Args:
+            query_texts: The query texts
+
+        Returns:
+            An array with one embedding row per query text
+        """
+        return self.model.encode(
+            query_texts,
+            batch_size=max(1, min(64, len(query_texts))),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
 
     def query(
             self,
@@ -159,33 +422,59 @@ class ChromaDBManager:
         Returns:
             A list of relevant messages with their metadata
         """
-        logger.info(f"Querying collection {self.collection_name} with: '{query_text}', top_k={top_k}")
+        return self.query_batch([query_text], top_k=top_k)[0]
+
+    def query_batch(
+            self,
+            query_texts: List[str],
+            top_k: int = config.QUERY_TOP_K
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Query the ChromaDB collection for relevant messages for several queries.
+
+        All queries are encoded in one batch and sent to ChromaDB in a single
+        query call.
+
+        Args:
+            query_texts: The query texts
+            top_k: Number of results to return per query
+
+        Returns:
+            One list of relevant messages with their metadata per query text
+        """
+        if not query_texts:
+            return []
+
+        logger.info(f"Querying collection {self.collection_name} with {len(query_texts)} queries, top_k={top_k}")
 
         try:
             collection = self.client.get_collection(name=self.collection_name)
 
-            # Generate query embedding
-            query_embedding = self.model.encode([query_text])[0]
+            # Generate query embeddings
+            query_embeddings = self.encode_queries(query_texts)
 
-            logger.info(f"Query embedding generated: {query_embedding}")
+            logger.info(f"Query embeddings generated: {query_embeddings.shape}")
 
             # Query the collection
             results = collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=np.ascontiguousarray(query_embeddings, dtype=np.float32),
                 n_results=top_k
             )
 
             # Format results
             formatted_results = [
-                {'text': doc, 'metadata': meta, 'id': id_val}
-                for doc, meta, id_val in zip(
-                    results['documents'][0],
-                    results['metadatas'][0],
-                    results['ids'][0]
+                [
+                    {'text': doc, 'metadata': meta, 'id': id_val}
+                    for doc, meta, id_val in zip(documents, metadatas, ids)
+                ]
+                for documents, metadatas, ids in zip(
+                    results['documents'],
+                    results['metadatas'],
+                    results['ids']
                 )
             ]
 
-            logger.info(f"Query returned {len(formatted_results)} results")
+            logger.info(f"Query returned {sum(map(len, formatted_results))} results")
             return formatted_results
 
         except Exception as e:
@@ -204,11 +493,7 @@ class ChromaDBManager:
             count = collection.count()
 
             # Get directory size
-            dir_size = 0
-            dir_path = Path(self.persist_directory)
-            for path in dir_path.glob('**/*'):
-                if path.is_file():
-                    dir_size += path.stat().st_size
+            dir_size = _dir_size(self.persist_directory)
 
             info = {
                 'collection_name': self.collection_name,
@@ -217,6 +502,8 @@ class ChromaDBManager:
                 'directory_size_bytes': dir_size,
                 'directory_size_gb': dir_size / (1024 ** 3),
                 'model_name': self.model_name,
+                'truncate_dim': self.truncate_dim,
+                'backend': self.backend,
                 'device': self.device
             }
 
@@ -260,12 +547,12 @@ class ChromaDBManager:
             logger.error(f"Error getting message by ID: {e}", exc_info=True)
             raise
 
-    def get_messages_by_date(self, date: str) -> List[Dict[str, Any]]:
+    def get_messages_by_date(self, date: int) -> List[Dict[str, Any]]:
         """
         Get all messages for a specific date.
 
         Args:
-            date: The date to retrieve messages for (in the format stored in metadata)
+            date: The date to retrieve messages for (Unix timestamp, as stored in metadata)
 
         Returns:
             A list of messages with their metadata
@@ -273,20 +560,19 @@ class ChromaDBManager:
         try:
             collection = self.client.get_collection(name=self.collection_name)
 
-            # Query the collection for messages with the specific date
-            results = collection.query(
-                query_texts=[""],  # Empty query to match all documents
-                where={"date": date},  # Filter by date
-                n_results=collection.count()  # Get all matching messages
+            # Fetch the messages with the specific date; a metadata filter needs no embedding search
+            results = collection.get(
+                where={"date": date},
+                include=['documents', 'metadatas']
             )
 
             # Format results
             formatted_results = [
                 {'text': doc, 'metadata': meta, 'id': id}
                 for doc, meta, id in zip(
-                    results['documents'][0],
-                    results['metadatas'][0],
-                    results['ids'][0]
+                    results['documents'],
+                    results['metadatas'],
+                    results['ids']
                 )
             ]
 
@@ -343,6 +629,9 @@ class ChromaDBManager:
         """
         Get N messages before and N messages after a specific message ID.
 
+        Both halves are located in the collection's timeline and fetched
+        together, see expand_many.
+
         Args:
             message: The reference message
             n: Number of messages to retrieve before and after the reference message
@@ -350,51 +639,153 @@ class ChromaDBManager:
         Returns:
             A list of messages around the reference message, sorted chronologically
         """
-        try:
-            collection = self.client.get_collection(name=self.collection_name)
+        return self.expand_many(messages=[message], n=n)
 
-            target_timestamp = int(message.date.timestamp())
+    def expand_many(
+            self,
+            messages: List[Message],
+            n: int = 5
+    ) -> List[Message]:
+        """
+        Get N messages before and N messages after each of several messages.
 
-            # Query for N messages before the target (timestamp < target_timestamp)
-            if n > 0:
-                query_messages_before = collection.get(
-                    where={"date": {"$lt": target_timestamp}},
-                    include=['documents', 'metadatas'],
-                    limit=n
-                )
-                # Convert ChromaDB result to the expected format
-                messages_before = self._convert_chromadb_get_result_to_messages(query_messages_before)
-            else:
-                messages_before = []
+        The context messages are located in the collection's timeline with a
+        binary search, then all of them are fetched by ID in a single get.
 
-            # Query for N messages after the target (timestamp > target_timestamp)
+        Args:
+            messages: The reference messages
+            n: Number of messages to retrieve before and after each reference message
+
+        Returns:
+            A list of unique messages: for each reference message in turn, its
+            context messages in chronological order
+        """
+        if not messages:
+            return []
+
+        try:
+            plan: List[Tuple[Message, np.ndarray, np.ndarray]] = []
+            found: Dict[str, Message] = {}
             if n > 0:
-                query_messages_after = collection.get(
-                    where={"date": {"$gt": target_timestamp}},
-                    include=['documents', 'metadatas'],
-                    limit=n
-                )
-                # Convert ChromaDB result to the expected format
-                messages_after = self._convert_chromadb_get_result_to_messages(query_messages_after)
+                collection = self.client.get_collection(name=self.collection_name)
+                timeline = self._get_timeline(collection)
+                timestamps = timeline.timestamps
+
+                for message in messages:
+                    target_timestamp = int(message.date.timestamp())
+                    start = int(np.searchsorted(timestamps, target_timestamp, side='left'))
+                    end = int(np.searchsorted(timestamps, target_timestamp, side='right'))
+
+                    before = timeline.ids[max(0, start - n):start]
+                    after = timeline.ids[end:end + n]
+                    plan.append((message, before, after))
+
+                context_ids = list(dict.fromkeys(
+                    msg_id
+                    for _, before, after in plan
+                    for ids in (before, after)
+                    for msg_id in ids
+                ))
+                if context_ids:
+                    result = collection.get(ids=context_ids, include=['documents', 'metadatas'])
+                    found = {msg.id: msg for msg in self._convert_chromadb_get_result_to_messages(result)}
             else:
-                messages_after = []
+                plan = [(message, (), ()) for message in messages]
 
-            # Combine all messages
-            all_messages = [message]
-            all_messages.extend(messages_before)
-            all_messages.extend(messages_after)
+            # Assemble the context around each message, deduplicating by ID
+            unique: Dict[str, Message] = {}
+            for message, before, after in plan:
+                for msg_id in before:
+                    if msg_id in found:
+                        unique.setdefault(msg_id, found[msg_id])
+                unique.setdefault(message.id, message)
+                for msg_id in after:
+                    if msg_id in found:
+                        unique.setdefault(msg_id, found[msg_id])
 
-            # Sort by timestamp to ensure chronological order
-            all_messages.sort(key=lambda msg: msg.date.timestamp())
-            return all_messages
+            return list(unique.values())
 
         except Exception as e:
-            logger.error(f"Error getting messages around message ID {message.id}: {e}", exc_info=True)
+            logger.error(f"Error getting messages around {len(messages)} messages: {e}", exc_info=True)
             raise
 
+    def _get_timeline(self, collection: chromadb.Collection) -> _MessageTimeline:
+        """
+        Get the timeline of the collection, building it on first use.
+
+        The timeline is rebuilt when the number of messages in the
+        collection has changed since it was built.
+
+        Args:
+            collection: The ChromaDB collection
+
+        Returns:
+            The collection's timeline
+        """
+        key = (self.persist_directory, self.collection_name)
+        count = collection.count()
+        with _TIMELINES_LOCK:
+            timeline = _TIMELINES.get(key)
+            build_lock = _TIMELINE_BUILD_LOCKS.setdefault(key, threading.Lock())
+        if timeline is not None and timeline.count == count:
+            return timeline
+
+        with build_lock:
+            # Another thread may have built the timeline while this one waited
+            with _TIMELINES_LOCK:
+                timeline = _TIMELINES.get(key)
+            if timeline is not None and timeline.count == count:
+                return timeline
+
+            timeline = self._build_timeline(collection, count)
+            with _TIMELINES_LOCK:
+                _TIMELINES[key] = timeline
+            return timeline
+
+    def _build_timeline(self, collection: chromadb.Collection, count: int) -> _MessageTimeline:
+        """
+        Read the dates of all messages in the collection into a timeline.
+
+        Args:
+            collection: The ChromaDB collection
+            count: Number of messages in the collection
+
+        Returns:
+            The collection's timeline
+        """
+        logger.info(f"Building timeline of {count} messages for collection {self.collection_name}")
+
+        def fetch_page(offset: int) -> Tuple[List[str], List[int]]:
+            page = collection.get(include=['metadatas'], limit=TIMELINE_PAGE_SIZE, offset=offset)
+            return page['ids'], [meta['date'] for meta in page['metadatas']]
+
+        # Pages are independent reads, so they are fetched concurrently
+        offsets = range(0, count, TIMELINE_PAGE_SIZE)
+        ids: List[str] = []
+        dates: List[int] = []
+        with ThreadPoolExecutor(max_workers=max(1, min(TIMELINE_FETCH_WORKERS, len(offsets)))) as executor:
+            for page_ids, page_dates in executor.map(fetch_page, offsets):
+                ids.extend(page_ids)
+                dates.extend(page_dates)
+
+        timestamps = np.array(dates, dtype=np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        return _MessageTimeline(
+            count=len(ids),
+            timestamps=timestamps[order],
+            ids=np.array(ids, dtype=object)[order]
+        )
+
+    def _drop_timeline(self) -> None:
+        """
+        Discard the cached timeline of the collection after it was modified.
+        """
+        with _TIMELINES_LOCK:
+            _TIMELINES.pop((self.persist_directory, self.collection_name), None)
+
 
 def load_into_chromadb(
-        messages: List[Dict[str, Any]],
+        messages: MessageColumns,
         collection_name: str = config.COLLECTION_NAME,
         batch_size: int = 5000,
         reset_collection: bool = True
@@ -406,7 +797,7 @@ def load_into_chromadb(
     and calls its load_messages method.
 
     Args:
-        messages: List of message dictionaries to load
+        messages: Processed messages to load
         collection_name: Name of the ChromaDB collection
         batch_size: Number of messages to process in each batch
         reset_collection: If True, reset the collection before loading
@@ -443,50 +834,57 @@ def query_messages(
     Returns:
         A list of relevant messages with their metadata and context messages
     """
-    logger.info(f"Querying messages with: '{query_text}', top_k={top_k}, context_n={context_n}")
+    return query_messages_batch(
+        query_texts=[query_text],
+        collection_name=collection_name,
+        top_k=top_k,
+        context_n=context_n
+    )[0]
+
+
+def query_messages_batch(
+        query_texts: List[str],
+        collection_name: str = config.COLLECTION_NAME,
+        top_k: int = config.QUERY_TOP_K,
+        context_n: int = config.QUERY_CONTEXT_N
+) -> List[List[Message]]:
+    """
+    Query ChromaDB for relevant messages with context for several queries.
+
+    The queries share one ChromaDBManager and are encoded and searched in a
+    single batch; context messages are then fetched for each query's results.
+
+    Args:
+        query_texts: The query texts
+        collection_name: Name of the ChromaDB collection
+        top_k: Number of results to return per query
+        context_n: Number of messages to include before and after each found message for context
+
+    Returns:
+        One list of relevant messages with context messages per query text
+    """
+    logger.info(f"Querying messages with {len(query_texts)} queries, top_k={top_k}, context_n={context_n}")
 
     db_manager = ChromaDBManager(collection_name=collection_name)
 
     # Get initial query results
-    initial_results = db_manager.query(query_text=query_text, top_k=top_k)
-    logger.info(f"Initial query returned {len(initial_results)} results")
-
-    if not initial_results:
-        logger.info("No results found for the query")
-        return []
-
-    messages = Message.many_from_chromadb_data(query_result=initial_results)
-    del initial_results
-
-    # For each result, get context messages
-    results_with_context: List[Message] = []
-    for i, message in enumerate(messages):
-        logger.debug(f"Processing result {i + 1}/{len(messages)}")
-        logger.debug(f"Getting context messages for result {i + 1} with ID {message.id}")
-
-        # Get messages around the date
-        context_messages = db_manager.expand_message_results(
-            message=message,
-            n=context_n
-        )
+    batch_results = db_manager.query_batch(query_texts=query_texts, top_k=top_k)
+
+    all_results = []
+    for query_text, initial_results in zip(query_texts, batch_results):
+        logger.info(f"Initial query for '{query_text}' returned {len(initial_results)} results")
 
-        logger.debug(f"Found {len(context_messages)} context messages around date {message.id}")
+        if not initial_results:
+            logger.info("No results found for the query")
+            all_results.append([])
+            continue
 
-        # Add the context messages to the results
-        results_with_context.extend(context_messages)
+        messages = Message.many_from_chromadb_data(query_result=initial_results)
 
-    # Remove duplicates (a message might be in multiple context windows)
-    unique_results = []
-    seen_ids = set()
+        # Get context messages for all results at once
+        unique_results = db_manager.expand_many(messages=messages, n=context_n)
 
-    for msg in results_with_context:
-        msg_id = msg.id
-        if msg_id and msg_id not in seen_ids:
-            seen_ids.add(msg_id)
-            unique_results.append(msg)
-        elif not msg_id:
-            # If there's no ID, we can't deduplicate, so just add it
-            unique_results.append(msg)
+        logger.info(f"Final query with context returned {len(unique_results)} unique messages")
+        all_results.append(unique_results)
 
-    logger.info(f"Final query with context returned {len(unique_results)} unique messages")
-    return unique_results
+    return all_results
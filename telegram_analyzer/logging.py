@@ -6,6 +6,7 @@ with configurable log levels and output destinations.
 """
 
 import logging
+import os
 import sys
 from pathlib import Path
 from typing import Optional
@@ -13,22 +14,33 @@ from typing import Optional
 from telegram_analyzer import config
 
 
+# Environment variable that overrides the configured log level
+LOG_LEVEL_ENV_VAR = "TELEGRAM_ANALYZER_LOG_LEVEL"
+
+
 def setup_logging(
-    log_level: str = config.LOG_LEVEL,
+    log_level: Optional[str] = None,
     log_format: str = config.LOG_FORMAT,
     log_file: Optional[str] = config.LOG_FILE
 ) -> logging.Logger:
     """
     Set up logging for the application.
 
+    This configures the package logger; it is called by the CLI entry point
+    rather than on import, so importing the package has no side effects.
+
     Args:
-        log_level: The logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_level: The logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL);
+            defaults to the TELEGRAM_ANALYZER_LOG_LEVEL environment variable,
+            then to config.LOG_LEVEL
         log_format: The format string for log messages
         log_file: Optional path to a log file
 
     Returns:
         A configured logger instance
     """
+    log_level = log_level or os.environ.get(LOG_LEVEL_ENV_VAR) or config.LOG_LEVEL
+
     # Convert string log level to logging constant
     numeric_level = getattr(logging, log_level.upper(), None)
     if not isinstance(numeric_level, int):
@@ -52,7 +64,8 @@ def setup_logging(
     if log_file:
         # Ensure the directory exists
         log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        if not log_path.parent.exists():
+            log_path.parent.mkdir(parents=True, exist_ok=True)
 
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(numeric_level)
@@ -62,5 +75,5 @@ def setup_logging(
     return logger
 
 
-# Create a default logger instance
-logger = setup_logging()
\ No newline at end of file
+# Package logger; handlers are added by setup_logging
+logger = logging.getLogger("telegram_analyzer")
\ No newline at end of file
@@ -5,6 +5,24 @@ This module provides the Message class for representing Telegram messages.
 """
 import datetime
 from dataclasses import dataclass
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def _to_datetime(timestamp: int) -> datetime.datetime:
+    """
+    Convert a Unix timestamp to a local datetime.
+
+    Context messages around neighbouring search hits often share
+    timestamps, so the conversions are memoized.
+
+    Args:
+        timestamp: The Unix timestamp
+
+    Returns:
+        The corresponding local datetime
+    """
+    return datetime.datetime.fromtimestamp(timestamp)
 
 
 @dataclass
@@ -37,7 +55,7 @@ class Message:
             :param text:
             :param date:
         """
-        date_time = datetime.datetime.fromtimestamp(date)
+        date_time = _to_datetime(date)
         return cls(id=msg_id, text=text, date=date_time)
 
     @classmethod
@@ -100,4 +118,6 @@ class Message:
         return [cls.from_chromadb_data(doc, meta['date'], msg_id) for doc, meta, msg_id in zip(docs, metas, msg_ids)]
 
     def __str__(self):
-        return f"Message(id={self.id}, text={self.text}, date={self.date})"
+        # Compact form used in LLM prompts: fewer characters to send and tokenize
+        # isoformat() is quicker than an strftime-style format spec
+        return f"[{self.id}|{self.date.isoformat(' ', 'minutes')}] {self.text}"
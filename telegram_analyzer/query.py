@@ -12,10 +12,15 @@ from typing import Dict, List, Any, Optional
 import ollama
 
 from telegram_analyzer import config
-from telegram_analyzer.database import query_messages
+from telegram_analyzer.database import query_messages_batch
 from telegram_analyzer.logging import logger
 from telegram_analyzer.message import Message
 
+# Reasoning blocks emitted by thinking models, removed from the answers
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+# "Answer: " prefix some models put before the answer
+_ANSWER_RE = re.compile(r'^Answer:\s*')
+
 
 class QueryProcessor:
     """
@@ -39,6 +44,9 @@ class QueryProcessor:
         self.collection_name = collection_name
         self.model_name = model_name
         self.model_options = model_options or config.OLLAMA_MODEL["options"]
+        self.keep_alive = config.OLLAMA_MODEL.get("keep_alive")
+        # One client for all questions, so its HTTP connection is reused
+        self._ollama = ollama.Client(host=config.OLLAMA_MODEL.get("host"))
         logger.info(f"Initialized QueryProcessor with model: {self.model_name}")
 
     def clean_response(self, response: str) -> str:
@@ -52,9 +60,9 @@ class QueryProcessor:
             The cleaned response
         """
         # Remove content between <think>...</think> tags
-        cleaned = re.sub(r'<think>.*?</think>', '', response, flags=re.DOTALL)
+        cleaned = _THINK_RE.sub('', response)
         # Remove "Answer: " prefix if present
-        cleaned = re.sub(r'^Answer:\s*', '', cleaned)
+        cleaned = _ANSWER_RE.sub('', cleaned)
         # Trim whitespace
         cleaned = cleaned.strip()
         return cleaned
@@ -69,15 +77,14 @@ class QueryProcessor:
         Returns:
             Formatted context string
         """
-        return "\n".join([
-            msg.__str__()
-            for msg in messages
-        ])
+        return "\n".join(map(str, messages))
 
     def answer_question(
             self,
             question: str,
-            top_k: int = config.QUERY_TOP_K
+            top_k: int = config.QUERY_TOP_K,
+            relevant_messages: Optional[List[Message]] = None,
+            retrieval_time: float = 0.0
     ) -> Dict[str, Any]:
         """
         Answer a question about Telegram messages.
@@ -85,21 +92,93 @@ class QueryProcessor:
         Args:
             question: The question to answer
             top_k: Number of relevant messages to include in the context
+            relevant_messages: Messages already retrieved for the question with
+                retrieve_messages; retrieved here when None
+            retrieval_time: Time spent retrieving relevant_messages, included
+                in the processing time
 
         Returns:
             A dictionary containing the question, answer, and metadata
         """
-        logger.info(f"Processing question: '{question}'")
+        if relevant_messages is not None:
+            return self._generate_answer(question, relevant_messages, retrieval_time)
+        return self.answer_questions([question], top_k=top_k)[0]
+
+    def answer_questions(
+            self,
+            questions: List[str],
+            top_k: int = config.QUERY_TOP_K
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several questions about Telegram messages.
+
+        Relevant messages for all questions are retrieved with one batched
+        embedding and ChromaDB query; answers are then generated one by one.
+
+        Args:
+            questions: The questions to answer
+            top_k: Number of relevant messages to include in the context
+
+        Returns:
+            One dictionary containing the question, answer, and metadata per question
+        """
         start_time = time.time()
 
         try:
-            # Query for relevant messages
-            relevant_messages = query_messages(
-                query_text=question,
-                collection_name=self.collection_name,
-                top_k=top_k
-            )
+            batch_messages = self.retrieve_messages(questions, top_k=top_k)
+        except Exception as e:
+            logger.error(f"Error answering questions: {e}", exc_info=True)
+            return [self._error_result(question, e, start_time) for question in questions]
+
+        retrieval_time = time.time() - start_time
+        return [
+            self._generate_answer(question, relevant_messages, retrieval_time)
+            for question, relevant_messages in zip(questions, batch_messages)
+        ]
+
+    def retrieve_messages(
+            self,
+            questions: List[str],
+            top_k: int = config.QUERY_TOP_K
+    ) -> List[List[Message]]:
+        """
+        Retrieve the relevant messages for several questions in one batch.
+
+        Args:
+            questions: The questions to retrieve messages for
+            top_k: Number of relevant messages to include in the context
+
+        Returns:
+            One list of relevant messages, with their context, per question
+        """
+        logger.info(f"Retrieving relevant messages for {len(questions)} question(s)")
+        return query_messages_batch(
+            query_texts=questions,
+            collection_name=self.collection_name,
+            top_k=top_k
+        )
+
+    def _generate_answer(
+            self,
+            question: str,
+            relevant_messages: List[Message],
+            retrieval_time: float
+    ) -> Dict[str, Any]:
+        """
+        Generate the answer to a question from its relevant messages.
 
+        Args:
+            question: The question to answer
+            relevant_messages: The messages retrieved for the question
+            retrieval_time: Time spent retrieving the messages, included in the processing time
+
+        Returns:
+            A dictionary containing the question, answer, and metadata
+        """
+        logger.info(f"Processing question: '{question}'")
+        start_time = time.time() - retrieval_time
+
+        try:
             logger.info(f"Retrieved {len(relevant_messages)} relevant messages")
 
             if not relevant_messages:
@@ -127,10 +206,11 @@ class QueryProcessor:
             logger.info(f"Context window size for this question: {len(context)} characters")
             generation_start_time = time.time()
 
-            response = ollama.generate(
+            response = self._ollama.generate(
                 model=self.model_name,
                 prompt=prompt,
-                options=self.model_options
+                options=self.model_options,
+                keep_alive=self.keep_alive
             )
 
             generation_time = time.time() - generation_start_time
@@ -158,15 +238,29 @@ class QueryProcessor:
 
         except Exception as e:
             logger.error(f"Error answering question: {e}", exc_info=True)
-            error_time = time.time() - start_time
-            return {
-                "question": question,
-                "answer": f"An error occurred while processing your question: {str(e)}",
-                "metadata": {
-                    "processing_time": error_time,
-                    "error": str(e)
-                }
+            return self._error_result(question, e, start_time)
+
+    def _error_result(self, question: str, error: Exception, start_time: float) -> Dict[str, Any]:
+        """
+        Build the result returned when answering a question fails.
+
+        Args:
+            question: The question that could not be answered
+            error: The error that occurred
+            start_time: Time processing of the question started
+
+        Returns:
+            A dictionary containing the question, error message, and metadata
+        """
+        error_time = time.time() - start_time
+        return {
+            "question": question,
+            "answer": f"An error occurred while processing your question: {str(error)}",
+            "metadata": {
+                "processing_time": error_time,
+                "error": str(error)
             }
+        }
 
 
 def answer_question(
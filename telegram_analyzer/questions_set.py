@@ -1,5 +1,18 @@
+"""
+Questions set module for the Telegram Analyzer package.
+
+This module provides the QuestionsSet class for predefined sets of questions,
+and functionality for loading them from the Python files in the queries folder.
+"""
+
+import importlib.util
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List
+from pathlib import Path
+from typing import Dict, List, Iterable, Optional, Tuple, Union
+
+from telegram_analyzer.logging import logger
 
 
 @dataclass
@@ -7,3 +20,156 @@ class QuestionsSet:
     title: str
     description: str
     questions: List[str]
+
+
+# Cached query sets by file path, with the file modification time they were loaded at
+QuestionsSetCache = Dict[str, Tuple[int, "QuestionsSet"]]
+
+
+def load_questions_set(query_file: Path) -> Optional[QuestionsSet]:
+    """
+    Import a query file and get the questions set it defines.
+
+    Args:
+        query_file: Path to a Python file defining a `questions_set` variable
+
+    Returns:
+        The questions set, or None if the file doesn't define one
+    """
+    module_name = query_file.stem
+    spec = importlib.util.spec_from_file_location(module_name, query_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    if not hasattr(module, "questions_set"):
+        logger.warning(f"No 'questionsSet' found in {query_file}")
+        return None
+
+    logger.info(f"Found query set '{module.questions_set.title}' in {query_file}")
+    return module.questions_set
+
+
+def load_questions_sets(
+        query_files: Iterable[Path],
+        cache_file: Optional[Union[str, Path]] = None
+) -> Dict[str, QuestionsSet]:
+    """
+    Load the questions sets defined in query files.
+
+    When a cache file is given, loaded sets are pickled to it together with
+    the modification time of their file, and a file is only imported again
+    once it has changed. Files that need importing are imported on a thread
+    pool, since imports mostly wait on the filesystem.
+
+    Args:
+        query_files: Paths to the query files
+        cache_file: Optional path to the pickle file caching loaded sets
+
+    Returns:
+        A dictionary mapping query file names (without extension) to their questions sets
+    """
+    query_files = list(query_files)
+    cache = _read_cache(cache_file) if cache_file else {}
+
+    # Use cached sets for unchanged files
+    loaded: Dict[Path, _LoadedQuestionsSet] = {}
+    for query_file in query_files:
+        try:
+            mtime = query_file.stat().st_mtime_ns
+        except OSError:
+            # Left for _load_query_file, which logs the error
+            continue
+
+        cached = cache.get(str(query_file.resolve()))
+        if cached is not None and cached[0] == mtime:
+            logger.info(f"Using cached query set '{cached[1].title}' for {query_file}")
+            loaded[query_file] = _LoadedQuestionsSet(query_file, mtime, cached[1])
+
+    # Import the remaining files
+    stale_files = [query_file for query_file in query_files if query_file not in loaded]
+    if stale_files:
+        with ThreadPoolExecutor(max_workers=min(8, len(stale_files))) as executor:
+            for result in executor.map(_load_query_file, stale_files):
+                loaded[result.path] = result
+                if result.questions_set is not None:
+                    cache[str(result.path.resolve())] = (result.mtime, result.questions_set)
+
+    if cache_file and any(loaded[query_file].questions_set is not None for query_file in stale_files):
+        _write_cache(cache_file, cache)
+
+    return {
+        query_file.stem: loaded[query_file].questions_set
+        for query_file in query_files
+        if query_file in loaded and loaded[query_file].questions_set is not None
+    }
+
+
+@dataclass
+class _LoadedQuestionsSet:
+    """
+    Result of loading a query file.
+
+    Attributes:
+        path: Path to the query file
+        mtime: Modification time of the file when it was loaded, in nanoseconds
+        questions_set: The questions set, or None if the file couldn't be loaded
+    """
+    path: Path
+    mtime: int
+    questions_set: Optional[QuestionsSet]
+
+
+def _load_query_file(query_file: Path) -> _LoadedQuestionsSet:
+    """
+    Load a query file, logging instead of raising on errors.
+
+    Args:
+        query_file: Path to the query file
+
+    Returns:
+        The loading result
+    """
+    mtime = 0
+    try:
+        mtime = query_file.stat().st_mtime_ns
+        return _LoadedQuestionsSet(query_file, mtime, load_questions_set(query_file))
+    except Exception as e:
+        logger.error(f"Error loading query file {query_file}: {e}", exc_info=True)
+        return _LoadedQuestionsSet(query_file, mtime, None)
+
+
+def _read_cache(cache_file: Union[str, Path]) -> QuestionsSetCache:
+    """
+    Read the query set cache.
+
+    Args:
+        cache_file: Path to the pickle file
+
+    Returns:
+        The cached query sets, or an empty dictionary if the cache is missing or unreadable
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Could not read query set cache {cache_file}: {e}")
+        return {}
+
+
+def _write_cache(cache_file: Union[str, Path], cache: QuestionsSetCache) -> None:
+    """
+    Write the query set cache.
+
+    Args:
+        cache_file: Path to the pickle file
+        cache: The query sets to cache
+    """
+    try:
+        cache_path = Path(cache_file)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump(cache, f)
+    except Exception as e:
+        logger.warning(f"Could not write query set cache {cache_file}: {e}")
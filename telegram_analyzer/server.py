@@ -0,0 +1,222 @@
+"""
+Server module for the Telegram Analyzer package.
+
+This module provides a small HTTP server that keeps a QueryProcessor loaded
+between command invocations, and a client that answers questions through it.
+
+Endpoints:
+- GET /info: Collection and model the server answers with
+- POST /query: Answer a question, given as {"question": ..., "top_k": ...}
+"""
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, Any, Optional
+from urllib import request
+
+from telegram_analyzer import config
+from telegram_analyzer.logging import logger
+
+# Imported for type hints only, so the client doesn't load ChromaDB and the embedding model
+if TYPE_CHECKING:
+    from telegram_analyzer.query import QueryProcessor
+
+
+class QueryServer(ThreadingHTTPServer):
+    """
+    HTTP server answering questions with a shared QueryProcessor.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, processor: "QueryProcessor", host: str, port: int):
+        """
+        Initialize the QueryServer.
+
+        Args:
+            processor: The query processor used to answer questions
+            host: Host to bind to
+            port: Port to bind to
+        """
+        self.processor = processor
+        super().__init__((host, port), QueryRequestHandler)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the QueryServer endpoints.
+    """
+
+    server: QueryServer
+
+    def do_GET(self) -> None:
+        """
+        Handle GET requests, describing the collection and model on /info.
+        """
+        if self.path != "/info":
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        processor = self.server.processor
+        self._send_json(200, {
+            "collection_name": processor.collection_name,
+            "model_name": processor.model_name
+        })
+
+    def do_POST(self) -> None:
+        """
+        Handle POST requests, answering the question in the JSON body on /query.
+
+        Bodies that aren't a JSON object with a question string get a 400 response.
+        """
+        if self.path != "/query":
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length))
+            if not isinstance(body, dict):
+                raise ValueError("the body must be a JSON object")
+            question = body["question"]
+            if not isinstance(question, str):
+                raise ValueError("the question must be a string")
+            top_k = int(body.get("top_k", config.QUERY_TOP_K))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        result = self.server.processor.answer_question(question=question, top_k=top_k)
+        self._send_json(200, result)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        """
+        Send a JSON response.
+
+        Args:
+            status: HTTP status code
+            payload: The response body
+        """
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Log requests through the package logger instead of stderr.
+        """
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class RemoteQueryProcessor:
+    """
+    Client answering questions through a running QueryServer.
+
+    It exposes the same answer_question interface as QueryProcessor.
+    """
+
+    def __init__(
+            self,
+            server_url: str,
+            collection_name: Optional[str] = None,
+            model_name: Optional[str] = None,
+            timeout: Optional[float] = getattr(config, "SERVER_SETTINGS", {}).get("timeout", 600)
+    ):
+        """
+        Initialize the RemoteQueryProcessor.
+
+        Args:
+            server_url: Base URL of the server, e.g. http://127.0.0.1:8765
+            collection_name: Collection the answers must come from, or None to accept the server's
+            model_name: Ollama model the answers must come from, or None to accept the server's
+            timeout: Timeout for each request, in seconds (None waits indefinitely)
+
+        Raises:
+            ValueError: If the server answers from a different collection or model
+        """
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+
+        info = self._request("GET", "/info")
+        self.collection_name = info["collection_name"]
+        self.model_name = info["model_name"]
+
+        mismatches = [
+            f"{setting} '{served}' instead of '{requested}'"
+            for setting, served, requested in (
+                ("collection", self.collection_name, collection_name),
+                ("model", self.model_name, model_name)
+            )
+            if requested is not None and served != requested
+        ]
+        if mismatches:
+            raise ValueError(
+                f"Query server {self.server_url} answers with {' and '.join(mismatches)}; "
+                "restart it with the same --collection and --model"
+            )
+        logger.info(f"Using query server {self.server_url} with model: {self.model_name}")
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Send a request to the server.
+
+        Args:
+            method: HTTP method
+            path: Endpoint path, e.g. /query
+            payload: Optional JSON body
+
+        Returns:
+            The decoded JSON response
+        """
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = request.Request(
+            f"{self.server_url}{path}",
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        with request.urlopen(req, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def answer_question(
+            self,
+            question: str,
+            top_k: int = config.QUERY_TOP_K
+    ) -> Dict[str, Any]:
+        """
+        Answer a question about Telegram messages using the server.
+
+        Args:
+            question: The question to answer
+            top_k: Number of relevant messages to include in the context
+
+        Returns:
+            A dictionary containing the question, answer, and metadata
+        """
+        return self._request("POST", "/query", {"question": question, "top_k": top_k})
+
+
+def serve(
+        processor: "QueryProcessor",
+        host: str = getattr(config, "SERVER_SETTINGS", {}).get("host", "127.0.0.1"),
+        port: int = getattr(config, "SERVER_SETTINGS", {}).get("port", 8765)
+) -> None:
+    """
+    Serve questions with a QueryProcessor until interrupted.
+
+    Args:
+        processor: The query processor used to answer questions
+        host: Host to bind to
+        port: Port to bind to
+    """
+    server = QueryServer(processor, host, port)
+    logger.info(f"Query server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Query server stopped")
+    finally:
+        server.server_close()